@@ -1,21 +1,158 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, stream_with_context
+import functools
+import gzip
+import hashlib
+import io
+import multiprocessing
 import os
-from werkzeug.utils import secure_filename
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from edi_parser import EDI837Parser
 import json
 
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['COMPRESS_MIN_SIZE'] = 4096  # Smallest JSON response worth gzipping
 
-# Create uploads directory if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+def _batch_workers_setting():
+    """/batch pool size from EDI_PARSER_BATCH_WORKERS, defaulting to up to 4 cores"""
+    value = os.environ.get('EDI_PARSER_BATCH_WORKERS')
+    if value is None:
+        return min(4, os.cpu_count() or 1)
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        raise ValueError(f"EDI_PARSER_BATCH_WORKERS must be a positive integer, got {value!r}")
+    return workers
+
+# Processes in each web worker's /batch pool; with 1, /batch parses in the request thread
+app.config['BATCH_WORKERS'] = _batch_workers_setting()
 
 ALLOWED_EXTENSIONS = {'txt', 'edi', 'x12', '837'}
+_ALLOWED_SUFFIXES = tuple('.' + ext for ext in sorted(ALLOWED_EXTENSIONS))
+
+# Parts of a parse response; clients can ask for a subset with ?fields=
+RESPONSE_FIELDS = frozenset({'summary', 'data_summary', 'segments', 'detailed_segments', 'raw_data'})
+
+# One parser per process; parse_file() resets its state on every call, so the
+# lock only has to keep parse + summary generation of a request together.
+PARSER = EDI837Parser()
+PARSER_LOCK = threading.Lock()
 
 def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
+
+def display_filename(filename):
+    """Base name of an upload for the response; uploads never touch the filesystem"""
+    return filename.replace('\\', '/').rsplit('/', 1)[-1][:255]
+
+def accepts_gzip():
+    """Whether the client accepts gzip; 'gzip;q=0' is a refusal, not a match"""
+    return request.accept_encodings['gzip'] > 0
+
+def requested_fields():
+    """Response fields selected with ?fields=a,b (all of them by default)"""
+    fields = request.args.get('fields', 'all')
+    if fields == 'all':
+        return RESPONSE_FIELDS
+    return RESPONSE_FIELDS & frozenset(fields.split(','))
+
+def parse_options(fields):
+    """Parser keyword arguments that skip building unrequested output"""
+    return {
+        'include_segments': 'segments' in fields,
+        'include_details': 'detailed_segments' in fields
+    }
+
+def build_payload(parser, result, fields=RESPONSE_FIELDS, **extra):
+    """Build the response payload and status code for a parser's result"""
+    if not result['success']:
+        return {
+            'success': False,
+            'error': result.get('error', 'Unknown error'),
+            'errors': result.get('errors', []),
+            **extra
+        }, 400
+    
+    payload = {'success': True}
+    if 'summary' in fields:
+        payload['summary'] = parser.get_summary_table()
+    if 'data_summary' in fields:
+        payload['data_summary'] = parser.get_data_summary()
+    if 'segments' in fields:
+        payload['segments'] = result['segments']
+    if 'detailed_segments' in fields:
+        payload['detailed_segments'] = result['detailed_segments']
+    if 'raw_data' in fields:
+        payload['raw_data'] = result['data']
+    payload.update(extra)
+    return payload, 200
+
+def parse_payload(content, fields=RESPONSE_FIELDS, **extra):
+    """Parse EDI content with the shared parser"""
+    with PARSER_LOCK:
+        result = PARSER.parse_file(content, **parse_options(fields))
+        return build_payload(PARSER, result, fields, **extra)
+
+def parse_upload_payload(file, fields=RESPONSE_FIELDS, **extra):
+    """Parse an uploaded file incrementally from its stream with the shared parser"""
+    with PARSER_LOCK:
+        result = PARSER.parse_stream(file.stream, **parse_options(fields))
+        return build_payload(PARSER, result, fields, **extra)
+
+@functools.lru_cache(maxsize=None)
+def _worker_parser():
+    """Parser reused for every batch file a worker process handles"""
+    return EDI837Parser()
+
+def _parse_batch_file(filename, raw, fields):
+    """Parse one file of a batch; runs in a worker process with its own parser"""
+    parser = _worker_parser()
+    # Decode the same way /upload does, so a file parses identically on every route
+    result = parser.parse_stream(io.BytesIO(raw), **parse_options(fields))
+    payload, _ = build_payload(parser, result, fields, filename=filename)
+    return payload
+
+_batch_pool_instance = None
+_BATCH_POOL_LOCK = threading.Lock()
+
+def _batch_pool():
+    """Process pool for /batch, created once on first use"""
+    global _batch_pool_instance
+    # Concurrent first requests must not each build (and leak) a pool
+    with _BATCH_POOL_LOCK:
+        if _batch_pool_instance is None:
+            # Spawned workers don't inherit this multi-threaded process's locks
+            _batch_pool_instance = ProcessPoolExecutor(
+                max_workers=app.config['BATCH_WORKERS'],
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _batch_pool_instance
+
+@app.after_request
+def compress_response(response):
+    """Gzip large JSON responses for clients that accept it"""
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200
+            or response.mimetype != 'application/json'
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not accepts_gzip()):
+        return response
+    
+    body = response.get_data()
+    if len(body) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    # The compressed body is a different representation of the same resource
+    etag, _ = response.get_etag()
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/')
 def index():
@@ -31,98 +168,126 @@ def upload_file():
         return jsonify({'error': 'No file selected'}), 400
     
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        
-        # Parse the EDI file
-        parser = EDI837Parser()
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            # Try with different encoding
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        
-        result = parser.parse_file(content)
-        
-        # Clean up uploaded file
-        os.remove(file_path)
-        
-        if result['success']:
-            summary_table = parser.get_summary_table()
-            data_summary = parser.get_data_summary()
-            return jsonify({
-                'success': True,
-                'summary': summary_table,
-                'data_summary': data_summary,
-                'segments': result['segments'],
-                'detailed_segments': result['detailed_segments'],
-                'raw_data': result['data'],
-                'filename': filename
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result.get('error', 'Unknown error'),
-                'errors': result.get('errors', [])
-            }), 400
+        filename = display_filename(file.filename)
+
+        # Parse the EDI file segment by segment straight from the upload stream
+        payload, status = parse_upload_payload(file, requested_fields(), filename=filename)
+        return jsonify(payload), status
     
     return jsonify({'error': 'Invalid file type. Please upload .txt, .edi, .x12, or .837 files'}), 400
 
-@app.route('/parse_text', methods=['POST'])
-def parse_text():
-    data = request.get_json()
-    if not data or 'content' not in data:
-        return jsonify({'error': 'No EDI content provided'}), 400
+@app.route('/upload_stream', methods=['POST'])
+def upload_stream():
+    """Parse an uploaded EDI file and stream its segments as NDJSON"""
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file selected'}), 400
     
-    parser = EDI837Parser()
-    result = parser.parse_file(data['content'])
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Invalid file type. Please upload .txt, .edi, .x12, or .837 files'}), 400
     
-    if result['success']:
-        summary_table = parser.get_summary_table()
-        data_summary = parser.get_data_summary()
-        return jsonify({
+    filename = display_filename(file.filename)
+    
+    # Only the segments and the summaries are streamed
+    fields = frozenset({'segments', 'summary', 'data_summary'})
+    payload, status = parse_upload_payload(file, fields, filename=filename)
+    if status != 200:
+        return jsonify(payload), status
+    segments = payload.pop('segments')
+    
+    def generate():
+        # One segment per line, then a final control line with the summaries
+        for segment in segments:
+            yield app.json.dumps(segment) + '\n'
+        yield app.json.dumps({'__summary__': {
             'success': True,
-            'summary': summary_table,
-            'data_summary': data_summary,
-            'segments': result['segments'],
-            'detailed_segments': result['detailed_segments'],
-            'raw_data': result['data']
-        })
+            'summary': payload['summary'],
+            'data_summary': payload['data_summary'],
+            'filename': filename
+        }}) + '\n'
+    
+    return app.response_class(generate(), mimetype='application/x-ndjson')
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    """Parse several uploaded EDI files in parallel, streaming one NDJSON line per file"""
+    files = [f for f in request.files.getlist('files') if f.filename]
+    if not files:
+        return jsonify({'error': 'No file selected'}), 400
+    
+    if not all(allowed_file(f.filename) for f in files):
+        return jsonify({'error': 'Invalid file type. Please upload .txt, .edi, .x12, or .837 files'}), 400
+    
+    fields = requested_fields()
+    if app.config['BATCH_WORKERS'] <= 1:
+        # A one-process pool would still parse serially, plus pickling every payload
+        def generate_inline():
+            for f in files:
+                payload, _ = parse_upload_payload(f, fields, filename=display_filename(f.filename))
+                yield app.json.dumps(payload) + '\n'
+        
+        # The uploads are read as the response streams, so keep the request open
+        return app.response_class(stream_with_context(generate_inline()), mimetype='application/x-ndjson')
+    
+    # Parsing is CPU-bound, so fan the files out to worker processes
+    pool = _batch_pool()
+    futures = [
+        pool.submit(_parse_batch_file, display_filename(f.filename), f.stream.read(), fields)
+        for f in files
+    ]
+    
+    def generate():
+        # Emit results in completion order; each line carries its filename
+        for future in as_completed(futures):
+            yield app.json.dumps(future.result()) + '\n'
+    
+    return app.response_class(generate(), mimetype='application/x-ndjson')
+
+@app.route('/parse_text', methods=['POST'])
+def parse_text():
+    if request.mimetype == 'text/plain':
+        # Raw EDI body: no JSON wrapper to decode
+        content = request.get_data(cache=False, as_text=True)
     else:
-        return jsonify({
-            'success': False,
-            'error': result.get('error', 'Unknown error'),
-            'errors': result.get('errors', [])
-        }), 400
+        # Don't keep the decoded body (up to 16MB) cached on the request
+        data = request.get_json(cache=False)
+        content = data.get('content') if isinstance(data, dict) else None
+    if not content:
+        return jsonify({'error': 'No EDI content provided'}), 400
+    
+    payload, status = parse_payload(content, requested_fields())
+    return jsonify(payload), status
+
+# Sample EDI 837 served by /sample
+SAMPLE_EDI = """ISA*00*          *00*          *ZZ*SUBMITTER      *ZZ*RECEIVER       *101127*1719*^*00501*000000905*0*P*:~GS*HC*SUBMITTER*RECEIVER*20101127*1719*1*X*005010X222A1~ST*837*0001*005010X222A1~BHT*0019*00*244579*20061015*1023*CH~NM1*41*2*PREMIER BILLING SERVICE*****46*TGJ23~PER*IC*CONTACT NAME*TE*7176149999~NM1*40*2*KEY INSURANCE COMPANY*****46*66783JJT~HL*1**20*1~PRV*BI*PXC*203BF0100Y~NM1*85*2*BEN KILDARE SERVICE*****XX*9876543210~N3*234 SEAWAY ST~N4*MIAMI*FL*33111~REF*EI*587654321~HL*2*1*22*0~SBR*P*18*******CI~NM1*IL*1*SMITH*JANE****MI*JS00111223333~N3*236 N MAIN ST~N4*MIAMI*FL*33413~DMG*D8*19430501*F~NM1*PR*2*KEY INSURANCE COMPANY*****PI*999996666~CLM*26463774*100***11:B:1*Y*A*Y*I~DTP*431*D8*20061003~REF*D9*17312345600006351~HI*BK:0340*BF:V7389~LX*1~SV1*HC:99213*40*UN*1***1~DTP*472*D8*20061003~SE*23*0001~GE*1*1~IEA*1*000000905~"""
+
+def _build_sample_response():
+    """Parse the sample once and return the encoded JSON body and status code"""
+    payload, status = parse_payload(SAMPLE_EDI, sample_content=SAMPLE_EDI)
+    return app.json.dumps(payload), status
+
+# The sample never changes, so it is parsed and encoded once at import
+_SAMPLE_BODY, _SAMPLE_STATUS = _build_sample_response()
+_SAMPLE_ETAG = hashlib.md5(_SAMPLE_BODY.encode('utf-8')).hexdigest()
+# ...and so is its gzipped form, rather than recompressing it on every request
+_SAMPLE_GZIP = gzip.compress(_SAMPLE_BODY.encode('utf-8'), compresslevel=6)
 
 @app.route('/sample')
 def sample():
     """Provide a sample EDI 837 for testing"""
-    sample_edi = """ISA*00*          *00*          *ZZ*SUBMITTER      *ZZ*RECEIVER       *101127*1719*^*00501*000000905*0*P*:~GS*HC*SUBMITTER*RECEIVER*20101127*1719*1*X*005010X222A1~ST*837*0001*005010X222A1~BHT*0019*00*244579*20061015*1023*CH~NM1*41*2*PREMIER BILLING SERVICE*****46*TGJ23~PER*IC*CONTACT NAME*TE*7176149999~NM1*40*2*KEY INSURANCE COMPANY*****46*66783JJT~HL*1**20*1~PRV*BI*PXC*203BF0100Y~NM1*85*2*BEN KILDARE SERVICE*****XX*9876543210~N3*234 SEAWAY ST~N4*MIAMI*FL*33111~REF*EI*587654321~HL*2*1*22*0~SBR*P*18*******CI~NM1*IL*1*SMITH*JANE****MI*JS00111223333~N3*236 N MAIN ST~N4*MIAMI*FL*33413~DMG*D8*19430501*F~NM1*PR*2*KEY INSURANCE COMPANY*****PI*999996666~CLM*26463774*100***11:B:1*Y*A*Y*I~DTP*431*D8*20061003~REF*D9*17312345600006351~HI*BK:0340*BF:V7389~LX*1~SV1*HC:99213*40*UN*1***1~DTP*472*D8*20061003~SE*23*0001~GE*1*1~IEA*1*000000905~"""
-    
-    parser = EDI837Parser()
-    result = parser.parse_file(sample_edi)
-    
-    if result['success']:
-        summary_table = parser.get_summary_table()
-        data_summary = parser.get_data_summary()
-        return jsonify({
-            'success': True,
-            'summary': summary_table,
-            'data_summary': data_summary,
-            'segments': result['segments'],
-            'detailed_segments': result['detailed_segments'],
-            'raw_data': result['data'],
-            'sample_content': sample_edi
-        })
+    if accepts_gzip():
+        response = app.response_class(_SAMPLE_GZIP, status=_SAMPLE_STATUS, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(_SAMPLE_ETAG, weak=True)
     else:
-        return jsonify({
-            'success': False,
-            'error': result.get('error', 'Unknown error')
-        }), 400
+        response = app.response_class(_SAMPLE_BODY, status=_SAMPLE_STATUS, mimetype='application/json')
+        response.set_etag(_SAMPLE_ETAG)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
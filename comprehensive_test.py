@@ -5,6 +5,7 @@ Demonstrates parsing real EDI 837 content and displaying results
 
 import sys
 import os
+from collections import Counter
 
 # Add the current directory to Python path
 sys.path.append('/workspaces/EDI-Parser')
@@ -39,18 +40,15 @@ def main():
             # Display segments information
             print("� PARSED SEGMENTS:")
             print("-" * 40)
-            segment_counts = {}
+            segment_counts = Counter()
+            tag_descriptions = {}
             for segment in result['segments']:
                 tag = segment['tag']
-                segment_counts[tag] = segment_counts.get(tag, 0) + 1
+                segment_counts[tag] += 1
+                tag_descriptions.setdefault(tag, segment['description'])
             
             for tag, count in segment_counts.items():
-                description = result['segments'][0]['description'] if result['segments'] else 'Unknown'
-                for seg in result['segments']:
-                    if seg['tag'] == tag:
-                        description = seg['description']
-                        break
-                print(f"  {tag}: {count} occurrence(s) - {description}")
+                print(f"  {tag}: {count} occurrence(s) - {tag_descriptions[tag]}")
             print()
             
             # Display parsed data structure
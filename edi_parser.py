@@ -3,17 +3,248 @@ EDI 837 (5010) Parser
 Supports X222, X223, X224 versions
 """
 
-import re
-from typing import Dict, List, Any, Optional
+import codecs
+import gc
+import heapq
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from operator import attrgetter
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass
+from types import MappingProxyType
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class EDISegment:
     """Represents a single EDI segment"""
     tag: str
     elements: List[str]
-    raw: str
+    separator: str = '*'
+    
+    @property
+    def raw(self) -> str:
+        """Raw segment text, rebuilt from the tag and elements on demand"""
+        return self.separator.join([self.tag, *self.elements])
+
+@dataclass
+class ParseContext:
+    """Loop state carried from one segment to the next during extraction"""
+    transaction: Optional[Dict[str, Any]] = None
+    claim: Optional[Dict[str, Any]] = None
+    hierarchy_level: Optional[Dict[str, Any]] = None
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Suspend cyclic garbage collection while building many small containers"""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+# Deletes line breaks in a single str.translate pass
+_LINE_BREAKS = str.maketrans('', '', '\r\n')
+
+# EDI segment definitions for 837
+_SEGMENT_DEFINITIONS = MappingProxyType({
+    'ISA': 'Interchange Control Header',
+    'GS': 'Functional Group Header',
+    'ST': 'Transaction Set Header',
+    'BHT': 'Beginning of Hierarchical Transaction',
+    'NM1': 'Individual or Organizational Name',
+    'N3': 'Party Location',
+    'N4': 'Geographic Location',
+    'REF': 'Reference Information',
+    'PER': 'Administrative Communications Contact',
+    'HL': 'Hierarchical Level',
+    'PRV': 'Provider Information',
+    'SBR': 'Subscriber Information',
+    'PAT': 'Patient Information',
+    'CLM': 'Claim Information',
+    'DTP': 'Date or Time or Period',
+    'CL1': 'Institutional Claim Code',
+    'PWK': 'Paperwork',
+    'CN1': 'Contract Information',
+    'AMT': 'Monetary Amount Information',
+    'HI': 'Health Care Diagnosis Code',
+    'LX': 'Transaction Set Line Number',
+    'SV1': 'Professional Service',
+    'SV2': 'Institutional Service Line',
+    'SV3': 'Dental Service',
+    'DX': 'Diagnosis',
+    'SE': 'Transaction Set Trailer',
+    'GE': 'Functional Group Trailer',
+    'IEA': 'Interchange Control Trailer'
+})
+
+# Entity type codes for NM1 segments
+_ENTITY_TYPES = MappingProxyType({
+    '40': 'Receiver',
+    '41': 'Submitter',
+    '85': 'Billing Provider',
+    '87': 'Pay-to Provider',
+    'IL': 'Insured or Subscriber',
+    'QC': 'Patient',
+    'PR': 'Payer',
+    'DN': 'Referring Provider',
+    'P3': 'Primary Care Provider',
+    '82': 'Rendering Provider'
+})
+
+# Detailed element definitions for each segment
+_ELEMENT_DEFINITIONS = MappingProxyType({
+    'ISA': [
+        {'pos': '01', 'name': 'Authorization Information Qualifier', 'description': 'Code to identify the type of information in the Authorization Information'},
+        {'pos': '02', 'name': 'Authorization Information', 'description': 'Information used for additional identification or authorization'},
+        {'pos': '03', 'name': 'Security Information Qualifier', 'description': 'Code to identify the type of information in the Security Information'},
+        {'pos': '04', 'name': 'Security Information', 'description': 'Information used for identifying the security information about the interchange sender'},
+        {'pos': '05', 'name': 'Interchange ID Qualifier', 'description': 'Qualifier to designate the system/method of code structure used to designate the sender'},
+        {'pos': '06', 'name': 'Interchange Sender ID', 'description': 'Identification code published by the sender for other parties to use'},
+        {'pos': '07', 'name': 'Interchange ID Qualifier', 'description': 'Qualifier to designate the system/method of code structure used to designate the receiver'},
+        {'pos': '08', 'name': 'Interchange Receiver ID', 'description': 'Identification code published by the receiver for other parties to use'},
+        {'pos': '09', 'name': 'Interchange Date', 'description': 'Date of the interchange'},
+        {'pos': '10', 'name': 'Interchange Time', 'description': 'Time of the interchange'},
+        {'pos': '11', 'name': 'Repetition Separator', 'description': 'Type is not applicable; the repetition separator is a delimiter'},
+        {'pos': '12', 'name': 'Interchange Control Version Number', 'description': 'Code specifying the version number of the interchange control structure'},
+        {'pos': '13', 'name': 'Interchange Control Number', 'description': 'A control number assigned by the interchange sender'},
+        {'pos': '14', 'name': 'Acknowledgment Requested', 'description': 'Code sent by the sender to request an interchange acknowledgment'},
+        {'pos': '15', 'name': 'Interchange Usage Indicator', 'description': 'Code to indicate whether data enclosed by this interchange envelope is test, production or information'}
+    ],
+    'GS': [
+        {'pos': '01', 'name': 'Functional ID Code', 'description': 'Code identifying a group of application related transaction sets'},
+        {'pos': '02', 'name': 'Application Sender Code', 'description': 'Code identifying party sending transmission'},
+        {'pos': '03', 'name': 'Application Receiver Code', 'description': 'Code identifying party receiving transmission'},
+        {'pos': '04', 'name': 'Date', 'description': 'Date expressed as CCYYMMDD'},
+        {'pos': '05', 'name': 'Time', 'description': 'Time expressed in 24-hour clock time as follows: HHMM, or HHMMSS, or HHMMSSD, or HHMMSSDD'},
+        {'pos': '06', 'name': 'Group Control Number', 'description': 'Assigned number originated and maintained by the sender'},
+        {'pos': '07', 'name': 'Responsible Agency Code', 'description': 'Code used to identify the issuer of the standard'},
+        {'pos': '08', 'name': 'Version / Release / Industry ID Code', 'description': 'Code indicating the version, release, subrelease, and industry identifier'}
+    ],
+    'ST': [
+        {'pos': '01', 'name': 'Transaction Set ID Code', 'description': 'Code uniquely identifying a Transaction Set'},
+        {'pos': '02', 'name': 'Transaction Set Control Number', 'description': 'Identifying control number that must be unique within the transaction set functional group'},
+        {'pos': '03', 'name': 'Implementation Convention Reference', 'description': 'Reference assigned to identify a specific implementation convention'}
+    ],
+    'BHT': [
+        {'pos': '01', 'name': 'Hierarchical Structure Code', 'description': 'Code indicating the hierarchical application structure of a transaction set'},
+        {'pos': '02', 'name': 'Transaction Set Purpose Code', 'description': 'Code identifying purpose of transaction set'},
+        {'pos': '03', 'name': 'Reference Identification', 'description': 'Reference information as defined for a particular Transaction Set'},
+        {'pos': '04', 'name': 'Date', 'description': 'Date expressed as CCYYMMDD'},
+        {'pos': '05', 'name': 'Time', 'description': 'Time expressed in 24-hour clock time'},
+        {'pos': '06', 'name': 'Transaction Type Code', 'description': 'Code specifying the type of transaction'}
+    ],
+    'NM1': [
+        {'pos': '01', 'name': 'Entity ID Code', 'description': 'Code identifying an organizational entity, a physical location, property or an individual'},
+        {'pos': '02', 'name': 'Entity Type Qualifier', 'description': 'Code qualifying the entity'},
+        {'pos': '03', 'name': 'Name Last or Organization Name', 'description': 'Individual last name or organizational name'},
+        {'pos': '04', 'name': 'Name First', 'description': 'Individual first name'},
+        {'pos': '05', 'name': 'Name Middle', 'description': 'Individual middle name or initial'},
+        {'pos': '06', 'name': 'Name Prefix', 'description': 'Prefix to individual name'},
+        {'pos': '07', 'name': 'Name Suffix', 'description': 'Suffix to individual name'},
+        {'pos': '08', 'name': 'ID Code Qualifier', 'description': 'Code designating the system/method of code structure used for Identification Code'},
+        {'pos': '09', 'name': 'ID Code', 'description': 'Code identifying a party or other code'}
+    ],
+    'CLM': [
+        {'pos': '01', 'name': 'Claim Submitter Identifier', 'description': 'Unique claim identifier assigned by the claim submitter'},
+        {'pos': '02', 'name': 'Monetary Amount', 'description': 'Total claim charge amount'},
+        {'pos': '03', 'name': 'Claim Filing Indicator Code', 'description': 'Code identifying the type of claim'},
+        {'pos': '04', 'name': 'Non-Institutional Claim Type Code', 'description': 'Code identifying the type of claim for non-institutional providers'},
+        {'pos': '05', 'name': 'Health Care Service Location Information', 'description': 'Information about the location where healthcare services were provided'},
+        {'pos': '06', 'name': 'Provider Accept Assignment Code', 'description': 'Code indicating whether the provider accepts assignment'},
+        {'pos': '07', 'name': 'Assignment Claim Participation Code', 'description': 'Code indicating the provider participation in assignment'},
+        {'pos': '08', 'name': 'Benefits Assignment Certification Indicator', 'description': 'Code indicating benefits assignment certification'},
+        {'pos': '09', 'name': 'Release of Information Code', 'description': 'Code indicating the release of information'}
+    ],
+    'SV1': [
+        {'pos': '01', 'name': 'Procedure Code', 'description': 'Procedure code and modifiers'},
+        {'pos': '02', 'name': 'Monetary Amount', 'description': 'Line item charge amount'},
+        {'pos': '03', 'name': 'Unit of Measure Code', 'description': 'Code specifying the units in which a value is being expressed'},
+        {'pos': '04', 'name': 'Service Unit Count', 'description': 'Number of units of service'},
+        {'pos': '05', 'name': 'Place of Service Code', 'description': 'Code identifying the place where the service was performed'},
+        {'pos': '06', 'name': 'Service Type Code', 'description': 'Code identifying the type of service'},
+        {'pos': '07', 'name': 'Composite Diagnosis Code Pointer', 'description': 'Reference to diagnosis codes'}
+    ],
+    'HI': [
+        {'pos': '01', 'name': 'Health Care Code Information', 'description': 'Code information for health care diagnosis, procedure, etc.'}
+    ],
+    'DTP': [
+        {'pos': '01', 'name': 'Date Time Qualifier', 'description': 'Code specifying type of date or time or both date and time'},
+        {'pos': '02', 'name': 'Date Time Period Format Qualifier', 'description': 'Code indicating the date format, time format, or date and time format'},
+        {'pos': '03', 'name': 'Date Time Period', 'description': 'Expression of a date, a time, or range of dates, times or dates and times'}
+    ]
+})
+
+# Element definitions indexed by position for direct lookup
+_ELEMENT_DEFINITIONS_BY_POS = MappingProxyType({
+    tag: {definition['pos']: definition for definition in definitions}
+    for tag, definitions in _ELEMENT_DEFINITIONS.items()
+})
+
+# Interpreted values for coded ISA elements, by element position
+_ISA_INTERPRETATIONS = MappingProxyType({
+    '01': {  # Authorization Information Qualifier
+        '00': 'No Authorization Information Present (No Meaningful Information in I02)',
+        '03': 'Additional Data Identification'
+    },
+    '03': {  # Security Information Qualifier
+        '00': 'No Security Information Present (No Meaningful Information in I04)',
+        '01': 'Password'
+    },
+    '05': {  # Interchange ID Qualifier (Sender)
+        'ZZ': 'Mutually Defined',
+        '01': 'Duns (Dun & Bradstreet)',
+        '14': 'Duns Plus Suffix',
+        '20': 'Health Industry Number',
+        '27': 'Carrier Identification Number',
+        '28': 'Fiscal Intermediary Identification Number',
+        '29': 'Medicare Provider and Supplier Identification Number',
+        '30': 'U.S. Federal Tax Identification Number'
+    },
+    '07': {  # Interchange ID Qualifier (Receiver)
+        'ZZ': 'Mutually Defined',
+        '01': 'Duns (Dun & Bradstreet)',
+        '14': 'Duns Plus Suffix',
+        '20': 'Health Industry Number',
+        '27': 'Carrier Identification Number',
+        '28': 'Fiscal Intermediary Identification Number',
+        '29': 'Medicare Provider and Supplier Identification Number',
+        '30': 'U.S. Federal Tax Identification Number'
+    },
+    '12': {  # Interchange Control Version Number
+        '00501': 'Standards Approved for Publication by ASC X12 Procedures Review Board through October 2003'
+    },
+    '14': {  # Acknowledgment Requested
+        '0': 'No Interchange Acknowledgment Requested',
+        '1': 'Interchange Acknowledgment Requested'
+    },
+    '15': {  # Interchange Usage Indicator
+        'T': 'Test Data',
+        'P': 'Production Data',
+        'I': 'Information'
+    }
+})
+
+# Interpreted values for coded NM1 elements, by element position
+_NM1_INTERPRETATIONS = MappingProxyType({
+    '01': _ENTITY_TYPES,  # Entity Identifier Code
+    '02': {  # Entity Type Qualifier
+        '1': 'Person',
+        '2': 'Non-Person Entity'
+    },
+    '08': {  # Identification Code Qualifier
+        'XX': 'Health Care Financing Administration National Provider Identifier',
+        'PI': 'Payor Identification',
+        'MI': 'Member Identification Number',
+        'EI': 'Employer Identification Number',
+        '46': 'Electronic Transmitter Identification Number'
+    }
+})
+
+# Two-digit element positions ('01', '02', ...) formatted once
+_ELEMENT_POSITIONS = tuple(f"{i:02d}" for i in range(1, 100))
 
 class EDI837Parser:
     """
@@ -21,168 +252,114 @@ class EDI837Parser:
     Supports X222/X223/X224 versions
     """
     
-    def __init__(self):
-        self.segments = []
-        self.parsed_data = {}
-        self.errors = []
+    # parsed_data list that NM1 names are collected into, by entity type
+    _NM1_BUCKET: Dict[str, str] = {
+        '85': 'providers',
+        '87': 'providers',
+        'DN': 'providers',
+        'P3': 'providers',
+        '82': 'providers',
+        'IL': 'subscribers',
+        'QC': 'patients'
+    }
+    
+    def __init__(self) -> None:
+        self.segments: List[EDISegment] = []
+        self.parsed_data: Dict[str, Any] = {}
+        self.errors: List[str] = []
+        self._summary_table: Optional[List[Dict[str, Any]]] = None
+        self._data_summary: Optional[Dict[str, Any]] = None
         
-        # EDI segment definitions for 837
-        self.segment_definitions = {
-            'ISA': 'Interchange Control Header',
-            'GS': 'Functional Group Header',
-            'ST': 'Transaction Set Header',
-            'BHT': 'Beginning of Hierarchical Transaction',
-            'NM1': 'Individual or Organizational Name',
-            'N3': 'Party Location',
-            'N4': 'Geographic Location',
-            'REF': 'Reference Information',
-            'PER': 'Administrative Communications Contact',
-            'HL': 'Hierarchical Level',
-            'PRV': 'Provider Information',
-            'SBR': 'Subscriber Information',
-            'PAT': 'Patient Information',
-            'CLM': 'Claim Information',
-            'DTP': 'Date or Time or Period',
-            'CL1': 'Institutional Claim Code',
-            'PWK': 'Paperwork',
-            'CN1': 'Contract Information',
-            'AMT': 'Monetary Amount Information',
-            'HI': 'Health Care Diagnosis Code',
-            'LX': 'Transaction Set Line Number',
-            'SV1': 'Professional Service',
-            'SV2': 'Institutional Service Line',
-            'SV3': 'Dental Service',
-            'DX': 'Diagnosis',
-            'SE': 'Transaction Set Trailer',
-            'GE': 'Functional Group Trailer',
-            'IEA': 'Interchange Control Trailer'
-        }
+        # Shared read-only lookup tables
+        self.segment_definitions = _SEGMENT_DEFINITIONS
+        self.entity_types = _ENTITY_TYPES
+        self.element_definitions = _ELEMENT_DEFINITIONS
         
-        # Entity type codes for NM1 segments
-        self.entity_types = {
-            '40': 'Receiver',
-            '41': 'Submitter',
-            '85': 'Billing Provider',
-            '87': 'Pay-to Provider',
-            'IL': 'Insured or Subscriber',
-            'QC': 'Patient',
-            'PR': 'Payer',
-            'DN': 'Referring Provider',
-            'P3': 'Primary Care Provider',
-            '82': 'Rendering Provider'
+        # Detailed-view enhancers for segments with coded elements
+        self._element_enhancers: Dict[str, Callable[[str, str, Dict[str, Any]], Dict[str, Any]]] = {
+            'ISA': self._enhance_isa_element,
+            'NM1': self._enhance_nm1_element
         }
         
-        # Detailed element definitions for each segment
-        self.element_definitions = {
-            'ISA': [
-                {'pos': '01', 'name': 'Authorization Information Qualifier', 'description': 'Code to identify the type of information in the Authorization Information'},
-                {'pos': '02', 'name': 'Authorization Information', 'description': 'Information used for additional identification or authorization'},
-                {'pos': '03', 'name': 'Security Information Qualifier', 'description': 'Code to identify the type of information in the Security Information'},
-                {'pos': '04', 'name': 'Security Information', 'description': 'Information used for identifying the security information about the interchange sender'},
-                {'pos': '05', 'name': 'Interchange ID Qualifier', 'description': 'Qualifier to designate the system/method of code structure used to designate the sender'},
-                {'pos': '06', 'name': 'Interchange Sender ID', 'description': 'Identification code published by the sender for other parties to use'},
-                {'pos': '07', 'name': 'Interchange ID Qualifier', 'description': 'Qualifier to designate the system/method of code structure used to designate the receiver'},
-                {'pos': '08', 'name': 'Interchange Receiver ID', 'description': 'Identification code published by the receiver for other parties to use'},
-                {'pos': '09', 'name': 'Interchange Date', 'description': 'Date of the interchange'},
-                {'pos': '10', 'name': 'Interchange Time', 'description': 'Time of the interchange'},
-                {'pos': '11', 'name': 'Repetition Separator', 'description': 'Type is not applicable; the repetition separator is a delimiter'},
-                {'pos': '12', 'name': 'Interchange Control Version Number', 'description': 'Code specifying the version number of the interchange control structure'},
-                {'pos': '13', 'name': 'Interchange Control Number', 'description': 'A control number assigned by the interchange sender'},
-                {'pos': '14', 'name': 'Acknowledgment Requested', 'description': 'Code sent by the sender to request an interchange acknowledgment'},
-                {'pos': '15', 'name': 'Interchange Usage Indicator', 'description': 'Code to indicate whether data enclosed by this interchange envelope is test, production or information'}
-            ],
-            'GS': [
-                {'pos': '01', 'name': 'Functional ID Code', 'description': 'Code identifying a group of application related transaction sets'},
-                {'pos': '02', 'name': 'Application Sender Code', 'description': 'Code identifying party sending transmission'},
-                {'pos': '03', 'name': 'Application Receiver Code', 'description': 'Code identifying party receiving transmission'},
-                {'pos': '04', 'name': 'Date', 'description': 'Date expressed as CCYYMMDD'},
-                {'pos': '05', 'name': 'Time', 'description': 'Time expressed in 24-hour clock time as follows: HHMM, or HHMMSS, or HHMMSSD, or HHMMSSDD'},
-                {'pos': '06', 'name': 'Group Control Number', 'description': 'Assigned number originated and maintained by the sender'},
-                {'pos': '07', 'name': 'Responsible Agency Code', 'description': 'Code used to identify the issuer of the standard'},
-                {'pos': '08', 'name': 'Version / Release / Industry ID Code', 'description': 'Code indicating the version, release, subrelease, and industry identifier'}
-            ],
-            'ST': [
-                {'pos': '01', 'name': 'Transaction Set ID Code', 'description': 'Code uniquely identifying a Transaction Set'},
-                {'pos': '02', 'name': 'Transaction Set Control Number', 'description': 'Identifying control number that must be unique within the transaction set functional group'},
-                {'pos': '03', 'name': 'Implementation Convention Reference', 'description': 'Reference assigned to identify a specific implementation convention'}
-            ],
-            'BHT': [
-                {'pos': '01', 'name': 'Hierarchical Structure Code', 'description': 'Code indicating the hierarchical application structure of a transaction set'},
-                {'pos': '02', 'name': 'Transaction Set Purpose Code', 'description': 'Code identifying purpose of transaction set'},
-                {'pos': '03', 'name': 'Reference Identification', 'description': 'Reference information as defined for a particular Transaction Set'},
-                {'pos': '04', 'name': 'Date', 'description': 'Date expressed as CCYYMMDD'},
-                {'pos': '05', 'name': 'Time', 'description': 'Time expressed in 24-hour clock time'},
-                {'pos': '06', 'name': 'Transaction Type Code', 'description': 'Code specifying the type of transaction'}
-            ],
-            'NM1': [
-                {'pos': '01', 'name': 'Entity ID Code', 'description': 'Code identifying an organizational entity, a physical location, property or an individual'},
-                {'pos': '02', 'name': 'Entity Type Qualifier', 'description': 'Code qualifying the entity'},
-                {'pos': '03', 'name': 'Name Last or Organization Name', 'description': 'Individual last name or organizational name'},
-                {'pos': '04', 'name': 'Name First', 'description': 'Individual first name'},
-                {'pos': '05', 'name': 'Name Middle', 'description': 'Individual middle name or initial'},
-                {'pos': '06', 'name': 'Name Prefix', 'description': 'Prefix to individual name'},
-                {'pos': '07', 'name': 'Name Suffix', 'description': 'Suffix to individual name'},
-                {'pos': '08', 'name': 'ID Code Qualifier', 'description': 'Code designating the system/method of code structure used for Identification Code'},
-                {'pos': '09', 'name': 'ID Code', 'description': 'Code identifying a party or other code'}
-            ],
-            'CLM': [
-                {'pos': '01', 'name': 'Claim Submitter Identifier', 'description': 'Unique claim identifier assigned by the claim submitter'},
-                {'pos': '02', 'name': 'Monetary Amount', 'description': 'Total claim charge amount'},
-                {'pos': '03', 'name': 'Claim Filing Indicator Code', 'description': 'Code identifying the type of claim'},
-                {'pos': '04', 'name': 'Non-Institutional Claim Type Code', 'description': 'Code identifying the type of claim for non-institutional providers'},
-                {'pos': '05', 'name': 'Health Care Service Location Information', 'description': 'Information about the location where healthcare services were provided'},
-                {'pos': '06', 'name': 'Provider Accept Assignment Code', 'description': 'Code indicating whether the provider accepts assignment'},
-                {'pos': '07', 'name': 'Assignment Claim Participation Code', 'description': 'Code indicating the provider participation in assignment'},
-                {'pos': '08', 'name': 'Benefits Assignment Certification Indicator', 'description': 'Code indicating benefits assignment certification'},
-                {'pos': '09', 'name': 'Release of Information Code', 'description': 'Code indicating the release of information'}
-            ],
-            'SV1': [
-                {'pos': '01', 'name': 'Procedure Code', 'description': 'Procedure code and modifiers'},
-                {'pos': '02', 'name': 'Monetary Amount', 'description': 'Line item charge amount'},
-                {'pos': '03', 'name': 'Unit of Measure Code', 'description': 'Code specifying the units in which a value is being expressed'},
-                {'pos': '04', 'name': 'Service Unit Count', 'description': 'Number of units of service'},
-                {'pos': '05', 'name': 'Place of Service Code', 'description': 'Code identifying the place where the service was performed'},
-                {'pos': '06', 'name': 'Service Type Code', 'description': 'Code identifying the type of service'},
-                {'pos': '07', 'name': 'Composite Diagnosis Code Pointer', 'description': 'Reference to diagnosis codes'}
-            ],
-            'HI': [
-                {'pos': '01', 'name': 'Health Care Code Information', 'description': 'Code information for health care diagnosis, procedure, etc.'}
-            ],
-            'DTP': [
-                {'pos': '01', 'name': 'Date Time Qualifier', 'description': 'Code specifying type of date or time or both date and time'},
-                {'pos': '02', 'name': 'Date Time Period Format Qualifier', 'description': 'Code indicating the date format, time format, or date and time format'},
-                {'pos': '03', 'name': 'Date Time Period', 'description': 'Expression of a date, a time, or range of dates, times or dates and times'}
-            ]
+        # Structured data extractors keyed by segment tag
+        self._segment_handlers: Dict[str, Callable[[EDISegment, ParseContext], Any]] = {
+            'ISA': self._parse_isa,
+            'GS': self._parse_gs,
+            'ST': self._parse_st,
+            'BHT': self._parse_bht,
+            'NM1': self._parse_nm1,
+            'CLM': self._parse_clm,
+            'HL': self._parse_hl,
+            'DTP': self._parse_dtp,
+            'HI': self._parse_hi,
+            'SV1': self._parse_sv1
         }
         
-    def parse_file(self, file_content: str) -> Dict[str, Any]:
-        """Parse EDI 837 file content"""
+    def parse_file(self, file_content: str, include_segments: bool = True,
+                   include_details: bool = True) -> Dict[str, Any]:
+        """Parse EDI 837 file content
+        
+        include_segments / include_details control whether the per-segment
+        'segments' and 'detailed_segments' lists are built; callers that only
+        need the structured data can skip them.
+        """
+        self._start_parse(include_segments, include_details)
+
         try:
-            # Clean and split the content
-            content = file_content.strip().replace('\n', '').replace('\r', '')
-            
-            # Determine segment separator (usually ~ or newline)
-            segment_separator = '~'
-            if '~' not in content:
-                segments = content.split('\n')
-            else:
-                segments = content.split('~')
+            # Clean the content; single-line files are used as-is without a copy
+            content = file_content
+            if '\n' in content or '\r' in content:
+                content = content.translate(_LINE_BREAKS)
+            content = content.strip()
             
-            # Parse each segment
-            for segment_raw in segments:
-                if segment_raw.strip():
-                    self._parse_segment(segment_raw.strip())
+            # Determine separators (declared in the ISA header when present)
+            element_separator, segment_separator = self._detect_separators(content)
+            self._parse_segments(self._iter_segments(content, segment_separator), element_separator)
             
-            # Extract structured data
-            self._extract_structured_data()
+            return self._build_result()
             
+        except Exception as e:
             return {
-                'success': True,
-                'data': self.parsed_data,
-                'segments': [self._parse_segment_elements(s) for s in self.segments],
-                'detailed_segments': [self._get_detailed_segment_info(s) for s in self.segments],
+                'success': False,
+                'error': str(e),
                 'errors': self.errors
             }
+    
+    def parse_stream(self, stream: BinaryIO, chunk_size: int = 1 << 16,
+                     include_segments: bool = True, include_details: bool = True) -> Dict[str, Any]:
+        """Parse EDI 837 content read incrementally from a binary stream"""
+        self._start_parse(include_segments, include_details)
+
+        try:
+            # Empty until the separators have been detected
+            element_separator = segment_separator = ''
+            buffer = ''
+            
+            for text in self._decode_chunks(stream, chunk_size):
+                buffer += text.translate(_LINE_BREAKS)
+                
+                if not segment_separator:
+                    # Decide only once the buffer settles it as parse_file would:
+                    # a complete padded ISA header, or a '~' within the 4096
+                    # characters it searches. Otherwise the content is a single
+                    # newline-terminated segment, so the decision waits for EOF
+                    buffer = buffer.lstrip()
+                    if buffer.startswith('ISA') and len(buffer) <= 105:
+                        continue
+                    if self._isa_separators(buffer) is None and buffer.find('~', 0, 4096) == -1:
+                        continue
+                    element_separator, segment_separator = self._detect_separators(buffer)
+                
+                # Parse every complete segment, keep the partial tail buffered
+                *complete, buffer = buffer.split(segment_separator)
+                self._parse_segments(complete, element_separator)
+            
+            buffer = buffer.strip()
+            if not segment_separator:
+                element_separator, segment_separator = self._detect_separators(buffer)
+            self._parse_segments(buffer.split(segment_separator), element_separator)
+            
+            return self._build_result()
             
         except Exception as e:
             return {
@@ -191,29 +368,60 @@ class EDI837Parser:
                 'errors': self.errors
             }
     
-    def _parse_segment(self, segment_raw: str):
-        """Parse individual EDI segment"""
-        if not segment_raw:
-            return
-            
-        # Element separator is usually * or |
-        element_separator = '*'
-        if '*' not in segment_raw and '|' in segment_raw:
-            element_separator = '|'
+    def iter_segment_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Yield the 'segments' entries of the last parse one at a time
         
-        elements = segment_raw.split(element_separator)
-        tag = elements[0] if elements else ''
+        Useful after parsing with include_segments=False, when the segment
+        view is only walked once and the full list is not worth building.
+        """
+        describe = self.segment_definitions.get
+        for segment in self.segments:
+            yield {
+                'tag': segment.tag,
+                'elements': segment.elements,
+                'description': describe(segment.tag, 'Unknown segment'),
+                'raw': segment.raw
+            }
+    
+    def _decode_chunks(self, stream: BinaryIO, chunk_size: int) -> Iterator[str]:
+        """Decode a binary stream chunk by chunk as UTF-8, falling back to latin-1"""
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        fallback = False
         
-        segment = EDISegment(
-            tag=tag,
-            elements=elements[1:] if len(elements) > 1 else [],
-            raw=segment_raw
-        )
+        for chunk in iter(lambda: stream.read(chunk_size), b''):
+            if not fallback:
+                try:
+                    yield decoder.decode(chunk)
+                    continue
+                except UnicodeDecodeError:
+                    # Not UTF-8: decode the rest of the stream as latin-1
+                    pending, _ = decoder.getstate()
+                    chunk = pending + chunk
+                    fallback = True
+            yield chunk.decode('latin-1')
         
-        self.segments.append(segment)
+        if not fallback:
+            try:
+                yield decoder.decode(b'', final=True)
+            except UnicodeDecodeError:
+                yield decoder.getstate()[0].decode('latin-1')
     
-    def _extract_structured_data(self):
-        """Extract structured data from parsed segments"""
+    def _iter_segments(self, content: str, segment_separator: str) -> Iterator[str]:
+        """Yield raw segments one at a time instead of splitting the whole content up front"""
+        find = content.find
+        step = len(segment_separator)
+        start = 0
+        end = find(segment_separator)
+        while end != -1:
+            yield content[start:end]
+            start = end + step
+            end = find(segment_separator, start)
+        yield content[start:]
+    
+    def _start_parse(self, include_segments: bool, include_details: bool) -> None:
+        """Reset per-parse state so a single parser instance can be reused"""
+        self.segments = []
+        self.errors = []
         self.parsed_data = {
             'interchange_control': {},
             'functional_groups': [],
@@ -224,33 +432,134 @@ class EDI837Parser:
             'patients': []
         }
         
-        current_transaction = None
-        current_claim = None
-        current_hierarchy_level = None
+        # Loop state carried from one segment to the next during extraction
+        self._context = ParseContext()
         
-        for segment in self.segments:
-            if segment.tag == 'ISA':
-                self._parse_isa(segment)
-            elif segment.tag == 'GS':
-                self._parse_gs(segment)
-            elif segment.tag == 'ST':
-                current_transaction = self._parse_st(segment)
-            elif segment.tag == 'BHT':
-                self._parse_bht(segment, current_transaction)
-            elif segment.tag == 'NM1':
-                self._parse_nm1(segment)
-            elif segment.tag == 'CLM':
-                current_claim = self._parse_clm(segment)
-            elif segment.tag == 'HL':
-                current_hierarchy_level = self._parse_hl(segment)
-            elif segment.tag == 'DTP':
-                self._parse_dtp(segment)
-            elif segment.tag == 'HI':
-                self._parse_hi(segment, current_claim)
-            elif segment.tag == 'SV1':
-                self._parse_sv1(segment, current_claim)
+        # Per-segment output lists (None when not requested)
+        self._segments_info: Optional[List[Dict[str, Any]]] = [] if include_segments else None
+        self._detailed_segments: Optional[List[Dict[str, Any]]] = [] if include_details else None
+        
+        # Summaries are built from parsed_data on first request
+        self._summary_table = None
+        self._data_summary = None
+    
+    def _parse_segments(self, raw_segments: Iterable[str], element_separator: str) -> None:
+        """Tokenize, extract and describe each raw segment in a single pass"""
+        describe = self.segment_definitions.get
+        get_handler = self._segment_handlers.get
+        ctx = self._context
+        segments_info = self._segments_info
+        detailed_segments = self._detailed_segments
+        
+        # Extraction allocates thousands of dicts and lists that never form
+        # cycles, so skip the collector passes their allocation would trigger
+        with _gc_paused():
+            for segment_raw in raw_segments:
+                segment_raw = segment_raw.strip()
+                if not segment_raw:
+                    continue
+                
+                segment = self._parse_segment(segment_raw, element_separator)
+                handler = get_handler(segment.tag)
+                if handler:
+                    handler(segment, ctx)
+                
+                if segments_info is not None:
+                    segments_info.append({
+                        'tag': segment.tag,
+                        'elements': segment.elements,
+                        'description': describe(segment.tag, 'Unknown segment'),
+                        'raw': segment_raw
+                    })
+                if detailed_segments is not None:
+                    detailed_segments.append(self._get_detailed_segment_info(segment, segment_raw))
+    
+    def _build_result(self) -> Dict[str, Any]:
+        """Assemble the parse result"""
+        result = {
+            'success': True,
+            'data': self.parsed_data,
+            'errors': self.errors
+        }
+        if self._segments_info is not None:
+            result['segments'] = self._segments_info
+        if self._detailed_segments is not None:
+            result['detailed_segments'] = self._detailed_segments
+        
+        # The envelope opens with ISA, GS and ST in that order and closes with
+        # IEA, so each header is checked at its one possible position
+        segments = self.segments
+        position = 0
+        for key, tag in (('isa', 'ISA'), ('gs', 'GS'), ('st', 'ST')):
+            if position < len(segments) and segments[position].tag == tag:
+                result[key] = self._envelope_segment(position)
+                position += 1
+            else:
+                result[key] = None
+        result['iea'] = self._envelope_segment(-1) if segments and segments[-1].tag == 'IEA' else None
+        return result
+    
+    def _envelope_segment(self, index: int) -> Dict[str, Any]:
+        """Detailed view of the segment at index, reusing the details pass when it ran"""
+        if self._detailed_segments is not None:
+            return self._detailed_segments[index]
+        segment = self.segments[index]
+        return self._get_detailed_segment_info(segment, segment.raw)
     
-    def _parse_isa(self, segment: EDISegment):
+    def _isa_separators(self, content: str) -> Optional[Tuple[str, str]]:
+        """Separators declared by a padded ISA header, or None without one"""
+        # ISA is fixed-width: the element separator is at offset 3 and the
+        # segment terminator at offset 105. Only trust those offsets when the
+        # header really is padded, i.e. all 16 separators precede offset 105
+        if content.startswith('ISA') and len(content) > 105:
+            element_separator = content[3]
+            segment_separator = content[105]
+            if (content.count(element_separator, 0, 105) == 16
+                    and not segment_separator.isalnum()
+                    and not segment_separator.isspace()
+                    and segment_separator != element_separator):
+                return element_separator, segment_separator
+        return None
+    
+    def _detect_separators(self, content: str) -> Tuple[str, str]:
+        """Determine the element separator and segment terminator for the content"""
+        separators = self._isa_separators(content)
+        if separators:
+            return separators
+        
+        # Segment separator is usually ~ or newline; a ~-terminated file has one
+        # within its first few segments, so only the head needs searching
+        segment_separator = '~' if content.find('~', 0, 4096) != -1 else '\n'
+        
+        # Element separator is usually * or |; sniff it once from the first segment
+        first_segment = content.partition(segment_separator)[0]
+        element_separator = '*'
+        if '*' not in first_segment and '|' in first_segment:
+            element_separator = '|'
+        return element_separator, segment_separator
+    
+    def _parse_segment(self, segment_raw: str, element_separator: str) -> EDISegment:
+        """Parse individual EDI segment"""
+        elements = segment_raw.split(element_separator)
+        # Interned tags hash once and compare by identity in the dispatch lookups
+        tag = sys.intern(elements[0]) if elements else ''
+        
+        segment = EDISegment(
+            tag=tag,
+            elements=elements[1:] if len(elements) > 1 else [],
+            separator=element_separator
+        )
+        
+        self.segments.append(segment)
+        return segment
+    
+    def _pad(self, elements: List[str], width: int) -> List[str]:
+        """Pad an element list with empty strings so positions below width can be indexed directly"""
+        if len(elements) < width:
+            return elements + [''] * (width - len(elements))
+        return elements
+    
+    def _parse_isa(self, segment: EDISegment, ctx: ParseContext) -> None:
         """Parse ISA - Interchange Control Header"""
         if len(segment.elements) >= 16:
             self.parsed_data['interchange_control'] = {
@@ -272,7 +581,7 @@ class EDI837Parser:
                 'component_separator': segment.elements[15]
             }
     
-    def _parse_gs(self, segment: EDISegment):
+    def _parse_gs(self, segment: EDISegment, ctx: ParseContext) -> None:
         """Parse GS - Functional Group Header"""
         if len(segment.elements) >= 8:
             fg = {
@@ -287,19 +596,20 @@ class EDI837Parser:
             }
             self.parsed_data['functional_groups'].append(fg)
     
-    def _parse_st(self, segment: EDISegment):
+    def _parse_st(self, segment: EDISegment, ctx: ParseContext) -> None:
         """Parse ST - Transaction Set Header"""
+        ctx.transaction = None
         if len(segment.elements) >= 2:
             ts = {
                 'transaction_set_id': segment.elements[0],
                 'control_number': segment.elements[1]
             }
             self.parsed_data['transaction_sets'].append(ts)
-            return ts
-        return None
+            ctx.transaction = ts
     
-    def _parse_bht(self, segment: EDISegment, transaction):
+    def _parse_bht(self, segment: EDISegment, ctx: ParseContext) -> None:
         """Parse BHT - Beginning of Hierarchical Transaction"""
+        transaction = ctx.transaction
         if len(segment.elements) >= 6 and transaction:
             transaction.update({
                 'hierarchical_structure_code': segment.elements[0],
@@ -310,62 +620,62 @@ class EDI837Parser:
                 'transaction_type_code': segment.elements[5]
             })
     
-    def _parse_nm1(self, segment: EDISegment):
+    def _parse_nm1(self, segment: EDISegment, ctx: ParseContext) -> None:
         """Parse NM1 - Individual or Organizational Name"""
         if len(segment.elements) >= 3:
-            entity_type = segment.elements[0]
+            e = self._pad(segment.elements, 9)
+            entity_type = sys.intern(e[0])
             entity_type_desc = self.entity_types.get(entity_type, f'Unknown ({entity_type})')
             
             name_info = {
                 'entity_type_code': entity_type,
                 'entity_type_description': entity_type_desc,
-                'entity_type_qualifier': segment.elements[1] if len(segment.elements) > 1 else '',
-                'name_last_or_organization': segment.elements[2] if len(segment.elements) > 2 else '',
-                'name_first': segment.elements[3] if len(segment.elements) > 3 else '',
-                'name_middle': segment.elements[4] if len(segment.elements) > 4 else '',
-                'name_prefix': segment.elements[5] if len(segment.elements) > 5 else '',
-                'name_suffix': segment.elements[6] if len(segment.elements) > 6 else '',
-                'id_code_qualifier': segment.elements[7] if len(segment.elements) > 7 else '',
-                'id_code': segment.elements[8] if len(segment.elements) > 8 else ''
+                'entity_type_qualifier': e[1],
+                'name_last_or_organization': e[2],
+                'name_first': e[3],
+                'name_middle': e[4],
+                'name_prefix': e[5],
+                'name_suffix': e[6],
+                'id_code_qualifier': e[7],
+                'id_code': e[8]
             }
             
-            if entity_type in ['85', '87', 'DN', 'P3', '82']:
-                self.parsed_data['providers'].append(name_info)
-            elif entity_type == 'IL':
-                self.parsed_data['subscribers'].append(name_info)
-            elif entity_type == 'QC':
-                self.parsed_data['patients'].append(name_info)
+            bucket = self._NM1_BUCKET.get(entity_type)
+            if bucket:
+                self.parsed_data[bucket].append(name_info)
     
-    def _parse_clm(self, segment: EDISegment):
+    def _parse_clm(self, segment: EDISegment, ctx: ParseContext) -> None:
         """Parse CLM - Claim Information"""
+        ctx.claim = None
         if len(segment.elements) >= 2:
+            e = self._pad(segment.elements, 9)
             claim = {
-                'claim_id': segment.elements[0],
-                'claim_amount': segment.elements[1],
-                'place_of_service': segment.elements[4] if len(segment.elements) > 4 else '',
-                'provider_signature_indicator': segment.elements[5] if len(segment.elements) > 5 else '',
-                'assignment_plan_participation': segment.elements[6] if len(segment.elements) > 6 else '',
-                'benefits_assignment_indicator': segment.elements[7] if len(segment.elements) > 7 else '',
-                'release_of_information_code': segment.elements[8] if len(segment.elements) > 8 else '',
+                'claim_id': e[0],
+                'claim_amount': e[1],
+                'place_of_service': e[4],
+                'provider_signature_indicator': e[5],
+                'assignment_plan_participation': e[6],
+                'benefits_assignment_indicator': e[7],
+                'release_of_information_code': e[8],
                 'diagnosis_codes': [],
                 'service_lines': []
             }
             self.parsed_data['claims'].append(claim)
-            return claim
-        return None
+            ctx.claim = claim
     
-    def _parse_hl(self, segment: EDISegment):
+    def _parse_hl(self, segment: EDISegment, ctx: ParseContext) -> None:
         """Parse HL - Hierarchical Level"""
+        ctx.hierarchy_level = None
         if len(segment.elements) >= 3:
-            return {
-                'hierarchical_id': segment.elements[0],
-                'parent_hierarchical_id': segment.elements[1],
-                'hierarchical_level_code': segment.elements[2],
-                'hierarchical_child_code': segment.elements[3] if len(segment.elements) > 3 else ''
+            e = self._pad(segment.elements, 4)
+            ctx.hierarchy_level = {
+                'hierarchical_id': e[0],
+                'parent_hierarchical_id': e[1],
+                'hierarchical_level_code': e[2],
+                'hierarchical_child_code': e[3]
             }
-        return None
     
-    def _parse_dtp(self, segment: EDISegment):
+    def _parse_dtp(self, segment: EDISegment, ctx: ParseContext) -> Optional[Dict[str, str]]:
         """Parse DTP - Date or Time or Period"""
         if len(segment.elements) >= 3:
             return {
@@ -375,31 +685,44 @@ class EDI837Parser:
             }
         return None
     
-    def _parse_hi(self, segment: EDISegment, claim):
+    def _parse_hi(self, segment: EDISegment, ctx: ParseContext) -> None:
         """Parse HI - Health Care Diagnosis Code"""
-        if claim and len(segment.elements) >= 1:
-            # Parse diagnosis codes
-            for element in segment.elements:
-                if element and ':' in element:
-                    qualifier, code = element.split(':', 1)
-                    claim['diagnosis_codes'].append({
-                        'qualifier': qualifier,
-                        'code': code
-                    })
+        claim = ctx.claim
+        if claim is None:
+            # Diagnosis codes outside a claim have nowhere to go
+            return
+        
+        # Parse diagnosis codes
+        claim['diagnosis_codes'].extend(
+            {'qualifier': qualifier, 'code': code}
+            for qualifier, sep, code in (element.partition(':') for element in segment.elements)
+            if sep
+        )
     
-    def _parse_sv1(self, segment: EDISegment, claim):
+    def _parse_sv1(self, segment: EDISegment, ctx: ParseContext) -> None:
         """Parse SV1 - Professional Service"""
-        if claim and len(segment.elements) >= 2:
+        claim = ctx.claim
+        if claim is None:
+            return
+        
+        if len(segment.elements) >= 2:
+            e = self._pad(segment.elements, 5)
             service_line = {
-                'procedure_code': segment.elements[0],
-                'charge_amount': segment.elements[1],
-                'unit_of_measure': segment.elements[2] if len(segment.elements) > 2 else '',
-                'service_unit_count': segment.elements[3] if len(segment.elements) > 3 else '',
-                'place_of_service': segment.elements[4] if len(segment.elements) > 4 else ''
+                'procedure_code': e[0],
+                'charge_amount': e[1],
+                'unit_of_measure': e[2],
+                'service_unit_count': e[3],
+                'place_of_service': e[4]
             }
             claim['service_lines'].append(service_line)
 
     def get_summary_table(self) -> List[Dict[str, Any]]:
+        """Summary table data for web display, built once per parse"""
+        if self._summary_table is None:
+            self._summary_table = self._build_summary_table()
+        return self._summary_table
+    
+    def _build_summary_table(self) -> List[Dict[str, Any]]:
         """Generate summary table data for web display"""
         summary = []
         
@@ -506,6 +829,12 @@ class EDI837Parser:
         return summary
 
     def get_data_summary(self) -> Dict[str, Any]:
+        """Comprehensive data summary for statistics display, built once per parse"""
+        if self._data_summary is None:
+            self._data_summary = self._build_data_summary()
+        return self._data_summary
+    
+    def _build_data_summary(self) -> Dict[str, Any]:
         """Generate comprehensive data summary for statistics display"""
         # Common procedure code descriptions for reference
         procedure_descriptions = {
@@ -555,7 +884,7 @@ class EDI837Parser:
             'L3806': 'Wrist Hand Finger Orthosis',
         }
         
-        summary = {
+        summary: Dict[str, Dict[str, Any]] = {
             'counts': {},
             'amounts': {},
             'details': {},
@@ -571,24 +900,21 @@ class EDI837Parser:
         summary['counts']['total_segments'] = len(self.segments)
         
         # Calculate financial amounts and procedure analysis
-        total_claim_amount = 0
-        total_service_amount = 0
+        total_claim_amount = self._sum_amounts(
+            [claim['claim_amount'] for claim in self.parsed_data.get('claims', []) if claim.get('claim_amount')]
+        )
+        total_service_amount: float = 0
         service_lines_count = 0
-        procedure_amounts = {}  # Track amounts by procedure code
-        procedure_counts = {}   # Track frequency by procedure code
+        procedure_amounts: Dict[str, Dict[str, Any]] = {}  # Track amounts by procedure code
+        procedure_counts: Counter[str] = Counter()  # Track frequency by procedure code
+        diagnosis_codes: Set[str] = set()  # Unique diagnosis codes
         
+        # Single pass over the claims for amounts, procedures and diagnoses
         for claim in self.parsed_data.get('claims', []):
-            # Claim amounts
-            if claim.get('claim_amount'):
-                try:
-                    total_claim_amount += float(claim['claim_amount'])
-                except (ValueError, TypeError):
-                    pass
-            
             # Service line amounts and procedure analysis
             for service in claim.get('service_lines', []):
                 service_lines_count += 1
-                charge_amount = 0
+                charge_amount: float = 0
                 
                 if service.get('charge_amount'):
                     try:
@@ -601,24 +927,29 @@ class EDI837Parser:
                 proc_code = service.get('procedure_code', '')
                 if proc_code:
                     # Extract code type and main code
-                    if ':' in proc_code:
-                        code_type, main_code = proc_code.split(':', 1)
-                    else:
+                    code_type, sep, main_code = proc_code.partition(':')
+                    if not sep:
                         code_type = 'UNKNOWN'
                         main_code = proc_code
                     
                     # Track procedure amounts and counts
-                    if main_code not in procedure_amounts:
-                        procedure_amounts[main_code] = {
+                    procedure = procedure_amounts.get(main_code)
+                    if procedure is None:
+                        procedure = procedure_amounts[main_code] = {
                             'total_amount': 0,
                             'count': 0,
                             'code_type': code_type,
                             'description': procedure_descriptions.get(main_code, f'Procedure Code {main_code}')
                         }
                     
-                    procedure_amounts[main_code]['total_amount'] += charge_amount
-                    procedure_amounts[main_code]['count'] += 1
-                    procedure_counts[main_code] = procedure_counts.get(main_code, 0) + 1
+                    procedure['total_amount'] += charge_amount
+                    procedure['count'] += 1
+                    procedure_counts[main_code] += 1
+            
+            # Diagnosis codes
+            for diag in claim.get('diagnosis_codes', []):
+                if diag.get('code'):
+                    diagnosis_codes.add(diag['code'])
         
         summary['amounts']['total_claim_amount'] = total_claim_amount
         summary['amounts']['total_service_amount'] = total_service_amount
@@ -633,41 +964,33 @@ class EDI837Parser:
         summary['procedure_analysis']['total_procedures'] = len(procedure_amounts)
         
         # Top procedures by amount
-        top_by_amount = sorted(
+        top_by_amount = heapq.nlargest(
+            10,
             procedure_amounts.items(), 
-            key=lambda x: x[1]['total_amount'], 
-            reverse=True
-        )[:10]
+            key=lambda x: x[1]['total_amount']
+        )
         summary['procedure_analysis']['top_by_amount'] = top_by_amount
         
         # Top procedures by frequency
-        top_by_frequency = sorted(
+        top_by_frequency = heapq.nlargest(
+            10,
             procedure_amounts.items(), 
-            key=lambda x: x[1]['count'], 
-            reverse=True
-        )[:10]
+            key=lambda x: x[1]['count']
+        )
         summary['procedure_analysis']['top_by_frequency'] = top_by_frequency
         
         # Provider details
-        provider_types = {}
-        for provider in self.parsed_data.get('providers', []):
-            ptype = provider.get('entity_type_description', 'Unknown')
-            provider_types[ptype] = provider_types.get(ptype, 0) + 1
-        summary['details']['provider_types'] = provider_types
+        provider_types = Counter(
+            provider.get('entity_type_description', 'Unknown')
+            for provider in self.parsed_data.get('providers', [])
+        )
+        summary['details']['provider_types'] = dict(provider_types)
         
         # Service details (keeping original structure for compatibility)
-        diagnosis_codes = []
-        
-        for claim in self.parsed_data.get('claims', []):
-            # Diagnosis codes
-            for diag in claim.get('diagnosis_codes', []):
-                if diag.get('code'):
-                    diagnosis_codes.append(diag['code'])
-        
-        summary['details']['procedure_codes'] = procedure_counts
-        summary['details']['diagnosis_codes'] = list(set(diagnosis_codes))  # Unique codes
+        summary['details']['procedure_codes'] = dict(procedure_counts)
+        summary['details']['diagnosis_codes'] = sorted(diagnosis_codes)
         summary['counts']['unique_procedures'] = len(procedure_counts)
-        summary['counts']['unique_diagnoses'] = len(set(diagnosis_codes))
+        summary['counts']['unique_diagnoses'] = len(diagnosis_codes)
         
         # Transaction details
         ic = self.parsed_data.get('interchange_control', {})
@@ -676,11 +999,9 @@ class EDI837Parser:
         summary['details']['interchange_date'] = ic.get('date', '')
         summary['details']['version'] = ic.get('version', '')
         
-        # Segment analysis
-        segment_counts = {}
-        for segment in self.segments:
-            segment_counts[segment.tag] = segment_counts.get(segment.tag, 0) + 1
-        summary['details']['segment_distribution'] = segment_counts
+        # Segment analysis: Counter tallies the tags in a single C-level call
+        segment_counts = Counter(map(attrgetter('tag'), self.segments))
+        summary['details']['segment_distribution'] = dict(segment_counts)
         
         # Data quality metrics
         total_elements = 0
@@ -688,7 +1009,7 @@ class EDI837Parser:
         
         for segment in self.segments:
             total_elements += len(segment.elements)
-            populated_elements += sum(1 for el in segment.elements if el.strip())
+            populated_elements += sum(1 for el in segment.elements if el and not el.isspace())
         
         summary['coverage']['total_elements'] = total_elements
         summary['coverage']['populated_elements'] = populated_elements
@@ -698,29 +1019,37 @@ class EDI837Parser:
         
         return summary
 
-    def _parse_segment_elements(self, segment: EDISegment) -> Dict[str, Any]:
-        """Parse segment elements with basic info"""
-        return {
-            'tag': segment.tag,
-            'elements': segment.elements,
-            'description': self.segment_definitions.get(segment.tag, 'Unknown segment'),
-            'raw': segment.raw
-        }
+    def _sum_amounts(self, values: List[str]) -> float:
+        """Sum numeric strings, skipping any that are not valid amounts"""
+        try:
+            # Common case: every value converts, so sum in one C-level pass
+            return sum(map(float, values))
+        except (ValueError, TypeError):
+            total: float = 0
+            for value in values:
+                try:
+                    total += float(value)
+                except (ValueError, TypeError):
+                    pass
+            return total
+
+    def _get_detailed_segment_info(self, segment: EDISegment, raw: str) -> Dict[str, Any]:
+        """Get detailed element-level information for a segment
 
-    def _get_detailed_segment_info(self, segment: EDISegment) -> Dict[str, Any]:
-        """Get detailed element-level information for a segment"""
-        element_definitions = self.element_definitions.get(segment.tag, [])
+        ``raw`` is the segment text as read, shared with the segments view
+        rather than re-joined from the elements.
+        """
+        element_definitions = _ELEMENT_DEFINITIONS_BY_POS.get(segment.tag, {})
+        positions = _ELEMENT_POSITIONS
+        enhance = self._element_enhancers.get(segment.tag)
         
         detailed_elements = []
         for i, element_value in enumerate(segment.elements):
-            element_position = f"{i+1:02d}"  # Format as 01, 02, etc.
+            # Format as 01, 02, etc.
+            element_position = positions[i] if i < len(positions) else f"{i+1:02d}"
             
             # Find element definition
-            element_def = None
-            for definition in element_definitions:
-                if definition['pos'] == element_position:
-                    element_def = definition
-                    break
+            element_def = element_definitions.get(element_position)
             
             if element_def:
                 element_info = {
@@ -728,7 +1057,8 @@ class EDI837Parser:
                     'name': element_def['name'],
                     'value': element_value,
                     'description': element_def['description'],
-                    'is_present': bool(element_value.strip()) if element_value else False
+                    'is_present': bool(element_value) and not element_value.isspace(),
+                    'is_defined': True
                 }
             else:
                 element_info = {
@@ -736,14 +1066,13 @@ class EDI837Parser:
                     'name': f'Element {element_position}',
                     'value': element_value,
                     'description': 'Element definition not available',
-                    'is_present': bool(element_value.strip()) if element_value else False
+                    'is_present': bool(element_value) and not element_value.isspace(),
+                    'is_defined': False
                 }
             
             # Add special processing for certain elements
-            if segment.tag == 'ISA':
-                element_info = self._enhance_isa_element(element_position, element_value, element_info)
-            elif segment.tag == 'NM1':
-                element_info = self._enhance_nm1_element(element_position, element_value, element_info)
+            if enhance:
+                element_info = enhance(element_position, element_value, element_info)
             
             detailed_elements.append(element_info)
         
@@ -751,80 +1080,22 @@ class EDI837Parser:
             'segment_tag': segment.tag,
             'segment_name': self.segment_definitions.get(segment.tag, 'Unknown segment'),
             'elements': detailed_elements,
-            'raw_segment': segment.raw,
+            'raw_segment': raw,
             'element_count': len(segment.elements)
         }
 
     def _enhance_isa_element(self, position: str, value: str, element_info: Dict[str, Any]) -> Dict[str, Any]:
         """Enhance ISA segment elements with specific values"""
-        enhancements = {
-            '01': {  # Authorization Information Qualifier
-                '00': 'No Authorization Information Present (No Meaningful Information in I02)',
-                '03': 'Additional Data Identification'
-            },
-            '03': {  # Security Information Qualifier
-                '00': 'No Security Information Present (No Meaningful Information in I04)',
-                '01': 'Password'
-            },
-            '05': {  # Interchange ID Qualifier (Sender)
-                'ZZ': 'Mutually Defined',
-                '01': 'Duns (Dun & Bradstreet)',
-                '14': 'Duns Plus Suffix',
-                '20': 'Health Industry Number',
-                '27': 'Carrier Identification Number',
-                '28': 'Fiscal Intermediary Identification Number',
-                '29': 'Medicare Provider and Supplier Identification Number',
-                '30': 'U.S. Federal Tax Identification Number'
-            },
-            '07': {  # Interchange ID Qualifier (Receiver)
-                'ZZ': 'Mutually Defined',
-                '01': 'Duns (Dun & Bradstreet)',
-                '14': 'Duns Plus Suffix',
-                '20': 'Health Industry Number',
-                '27': 'Carrier Identification Number',
-                '28': 'Fiscal Intermediary Identification Number',
-                '29': 'Medicare Provider and Supplier Identification Number',
-                '30': 'U.S. Federal Tax Identification Number'
-            },
-            '12': {  # Interchange Control Version Number
-                '00501': 'Standards Approved for Publication by ASC X12 Procedures Review Board through October 2003'
-            },
-            '14': {  # Acknowledgment Requested
-                '0': 'No Interchange Acknowledgment Requested',
-                '1': 'Interchange Acknowledgment Requested'
-            },
-            '15': {  # Interchange Usage Indicator
-                'T': 'Test Data',
-                'P': 'Production Data',
-                'I': 'Information'
-            }
-        }
-        
-        if position in enhancements and value in enhancements[position]:
-            element_info['interpreted_value'] = enhancements[position][value]
+        values = _ISA_INTERPRETATIONS.get(position)
+        if values and value in values:
+            element_info['interpreted_value'] = values[value]
         
         return element_info
 
     def _enhance_nm1_element(self, position: str, value: str, element_info: Dict[str, Any]) -> Dict[str, Any]:
         """Enhance NM1 segment elements with specific values"""
-        if position == '01' and value in self.entity_types:
-            element_info['interpreted_value'] = self.entity_types[value]
-        elif position == '02':
-            type_map = {
-                '1': 'Person',
-                '2': 'Non-Person Entity'
-            }
-            if value in type_map:
-                element_info['interpreted_value'] = type_map[value]
-        elif position == '08':
-            qualifier_map = {
-                'XX': 'Health Care Financing Administration National Provider Identifier',
-                'PI': 'Payor Identification',
-                'MI': 'Member Identification Number',
-                'EI': 'Employer Identification Number',
-                '46': 'Electronic Transmitter Identification Number'
-            }
-            if value in qualifier_map:
-                element_info['interpreted_value'] = qualifier_map[value]
+        values = _NM1_INTERPRETATIONS.get(position)
+        if values and value in values:
+            element_info['interpreted_value'] = values[value]
         
         return element_info
\ No newline at end of file
@@ -5,12 +5,21 @@ Demonstrates the new detailed element parsing capabilities
 
 import sys
 import os
+from itertools import islice
+from operator import countOf, itemgetter
 
 # Add the current directory to Python path
 sys.path.append('/workspaces/EDI-Parser')
 
 from edi_parser import EDI837Parser
 
+# Flags counted for the element statistics
+is_present = itemgetter('is_present')
+is_defined = itemgetter('is_defined')
+
+# Per-element row of the detailed display: status, position, name, value
+ELEMENT_ROW = "%s %s %-35s %-20s"
+
 def main():
     print("🔬 ELEMENT-LEVEL EDI 837 PARSER TEST")
     print("=" * 60)
@@ -19,15 +28,13 @@ def main():
     sample_file = '/workspaces/EDI-Parser/sample_edi_837.txt'
     
     try:
-        with open(sample_file, 'r') as f:
-            edi_content = f.read().strip()
-        
-        print(f"📄 Loaded sample EDI file: {len(edi_content)} characters")
-        print()
-        
-        # Parse the EDI content
+        # Parse straight from the binary file; parse_stream decodes it chunk by chunk
         parser = EDI837Parser()
-        result = parser.parse_file(edi_content)
+        with open(sample_file, 'rb') as f:
+            print(f"📄 Loaded sample EDI file: {os.fstat(f.fileno()).st_size} bytes")
+            print()
+            
+            result = parser.parse_stream(f)
         
         if result['success']:
             print("✅ PARSING SUCCESSFUL!")
@@ -39,54 +46,58 @@ def main():
             
             # Show detailed parsing for ISA segment (like in your image)
             if result['detailed_segments']:
-                for i, segment in enumerate(result['detailed_segments'][:3]):  # Show first 3 segments
-                    print(f"\n📋 {segment['segment_tag']} - {segment['segment_name']}")
-                    print("-" * 50)
+                for i, segment in enumerate(islice(result['detailed_segments'], 3)):  # Show first 3 segments
+                    # Collect the segment's lines and print them in one call
+                    lines = [f"\n📋 {segment['segment_tag']} - {segment['segment_name']}", "-" * 50]
                     
                     for element in segment['elements']:
+                        value = element['value']
+                        interpreted = element.get('interpreted_value')
                         status = "✅" if element['is_present'] else "❌"
-                        value_display = element['value'] if element['value'] else "(empty)"
+                        value_display = value if value else "(empty)"
                         
-                        print(f"{status} {element['position']} {element['name']:<35} {value_display:<20}")
+                        lines.append(ELEMENT_ROW % (status, element['position'], element['name'], value_display))
                         
                         # Show interpreted value if available
-                        if element.get('interpreted_value'):
-                            print(f"     └─ Meaning: {element['interpreted_value']}")
+                        if interpreted:
+                            lines.append(f"     └─ Meaning: {interpreted}")
                         
-                        print(f"     └─ Description: {element['description']}")
-                        print()
+                        lines.append(f"     └─ Description: {element['description']}")
+                        lines.append("")
+                    
+                    print("\n".join(lines))
             
             # Show ISA segment in detail (like your attached image)
             print("\n🎯 ISA SEGMENT DETAILED BREAKDOWN (X12 837 Format):")
             print("=" * 70)
             
-            isa_segment = None
-            for segment in result['detailed_segments']:
-                if segment['segment_tag'] == 'ISA':
-                    isa_segment = segment
-                    break
+            # The parser hands back the interchange header directly
+            isa_segment = result['isa']
             
             if isa_segment:
-                print(f"Segment: ISA - {isa_segment['segment_name']}")
-                print()
+                lines = [f"Segment: ISA - {isa_segment['segment_name']}", ""]
                 for element in isa_segment['elements']:
-                    pos_str = f"{element['position']}"
-                    value_str = element['value'] if element['value'] else "(empty)"
+                    value = element['value']
+                    value_str = value if value else "(empty)"
                     meaning_str = element.get('interpreted_value', '')
                     
-                    print(f"◯ {element['name']:<40} {pos_str}")
+                    lines.append(f"◯ {element['name']:<40} {element['position']}")
                     if meaning_str:
-                        print(f"  {meaning_str:<55} {value_str}")
+                        lines.append(f"  {meaning_str:<55} {value_str}")
                     else:
-                        print(f"  {value_str}")
-                    print()
+                        lines.append(f"  {value_str}")
+                    lines.append("")
+                print("\n".join(lines))
             
             # Show statistics
             print("📊 ELEMENT PARSING STATISTICS:")
             print("-" * 40)
-            total_elements = sum(len(seg['elements']) for seg in result['detailed_segments'])
-            present_elements = sum(sum(1 for el in seg['elements'] if el['is_present']) for seg in result['detailed_segments'])
-            defined_elements = sum(sum(1 for el in seg['elements'] if 'Element definition not available' not in el['description']) for seg in result['detailed_segments'])
+            total_elements = present_elements = defined_elements = 0
+            for segment in result['detailed_segments']:
+                elements = segment['elements']
+                total_elements += len(elements)
+                present_elements += countOf(map(is_present, elements), True)
+                defined_elements += countOf(map(is_defined, elements), True)
             
             print(f"  Total Elements Parsed: {total_elements}")
             print(f"  Elements with Data: {present_elements}")
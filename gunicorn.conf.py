@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration for running the EDI 837 Parser in production
+Usage: gunicorn app:app
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('EDI_PARSER_BIND', '0.0.0.0:5000')
+
+# Parsing is CPU-bound, so scale with worker processes; threads keep slow
+# uploads from blocking a worker while it waits on the network
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# Each web worker has its own /batch process pool; size it with
+# EDI_PARSER_BATCH_WORKERS (1 parses /batch files in the request thread)
+threads = 4
+timeout = 60
+
+# Recycle workers periodically to bound memory growth from large files
+max_requests = 1000
+max_requests_jitter = 50
+
+sendfile = True
@@ -4,13 +4,19 @@ Test script for EDI 837 Parser
 Demonstrates parsing functionality with sample data
 """
 
+import io
+from itertools import groupby, islice
+from operator import itemgetter
+
 from edi_parser import EDI837Parser
 
+# Sample EDI 837 (5010) data
+SAMPLE_EDI = """ISA*00*          *00*          *ZZ*SUBMITTER      *ZZ*RECEIVER       *101127*1719*^*00501*000000905*0*P*:~GS*HC*SUBMITTER*RECEIVER*20101127*1719*1*X*005010X222A1~ST*837*0001*005010X222A1~BHT*0019*00*244579*20061015*1023*CH~NM1*41*2*PREMIER BILLING SERVICE*****46*TGJ23~PER*IC*CONTACT NAME*TE*7176149999~NM1*40*2*KEY INSURANCE COMPANY*****46*66783JJT~HL*1**20*1~PRV*BI*PXC*203BF0100Y~NM1*85*2*BEN KILDARE SERVICE*****XX*9876543210~N3*234 SEAWAY ST~N4*MIAMI*FL*33111~REF*EI*587654321~HL*2*1*22*0~SBR*P*18*******CI~NM1*IL*1*SMITH*JANE****MI*JS00111223333~N3*236 N MAIN ST~N4*MIAMI*FL*33413~DMG*D8*19430501*F~NM1*PR*2*KEY INSURANCE COMPANY*****PI*999996666~CLM*26463774*100***11:B:1*Y*A*Y*I~DTP*431*D8*20061003~REF*D9*17312345600006351~HI*BK:0340*BF:V7389~LX*1~SV1*HC:99213*40*UN*1***1~DTP*472*D8*20061003~SE*23*0001~GE*1*1~IEA*1*000000905~"""
+
 def test_sample_edi():
     """Test the parser with sample EDI 837 data"""
     
-    # Sample EDI 837 (5010) data
-    sample_edi = """ISA*00*          *00*          *ZZ*SUBMITTER      *ZZ*RECEIVER       *101127*1719*^*00501*000000905*0*P*:~GS*HC*SUBMITTER*RECEIVER*20101127*1719*1*X*005010X222A1~ST*837*0001*005010X222A1~BHT*0019*00*244579*20061015*1023*CH~NM1*41*2*PREMIER BILLING SERVICE*****46*TGJ23~PER*IC*CONTACT NAME*TE*7176149999~NM1*40*2*KEY INSURANCE COMPANY*****46*66783JJT~HL*1**20*1~PRV*BI*PXC*203BF0100Y~NM1*85*2*BEN KILDARE SERVICE*****XX*9876543210~N3*234 SEAWAY ST~N4*MIAMI*FL*33111~REF*EI*587654321~HL*2*1*22*0~SBR*P*18*******CI~NM1*IL*1*SMITH*JANE****MI*JS00111223333~N3*236 N MAIN ST~N4*MIAMI*FL*33413~DMG*D8*19430501*F~NM1*PR*2*KEY INSURANCE COMPANY*****PI*999996666~CLM*26463774*100***11:B:1*Y*A*Y*I~DTP*431*D8*20061003~REF*D9*17312345600006351~HI*BK:0340*BF:V7389~LX*1~SV1*HC:99213*40*UN*1***1~DTP*472*D8*20061003~SE*23*0001~GE*1*1~IEA*1*000000905~"""
+    sample_edi = SAMPLE_EDI
     
     print("EDI 837 (5010) Parser Test")
     print("=" * 50)
@@ -30,19 +36,18 @@ def test_sample_edi():
         print("-" * 80)
         summary = parser.get_summary_table()
         
-        current_section = None
-        for item in summary:
-            if item['Section'] != current_section:
-                current_section = item['Section']
-                print(f"\n🏷️  {current_section}:")
-                print("-" * 40)
+        # Rows arrive grouped by section; print a header at each section change
+        for section, items in groupby(summary, key=itemgetter('Section')):
+            print(f"\n🏷️  {section}:")
+            print("-" * 40)
             
-            print(f"  {item['Field']:<25}: {item['Value']:<20} ({item['Description']})")
+            for item in items:
+                print(f"  {item['Field']:<25}: {item['Value']:<20} ({item['Description']})")
         
         # Display segment breakdown
         print(f"\n🔧 SEGMENT BREAKDOWN:")
         print("-" * 80)
-        for segment in result['segments'][:10]:  # Show first 10 segments
+        for segment in islice(result['segments'], 10):  # Show first 10 segments
             print(f"  {segment['tag']:<5}: {segment['description']}")
             if segment['elements']:
                 print(f"        Elements: {' | '.join(segment['elements'][:5])}")  # Show first 5 elements
@@ -96,9 +101,77 @@ def test_parser_methods():
     result = parser.parse_file("INVALID*EDI*CONTENT")
     print(f"Invalid content test: {'✅ Handled gracefully' if not result['success'] else '❌ Should fail'}")
 
+def test_non_padded_isa():
+    """Test separator detection when the ISA header is not fixed-width"""
+    print("\n\n🧪 TESTING NON-PADDED ISA HEADER:")
+    print("=" * 50)
+    
+    # ISA fields are not space-padded, so offset 105 falls inside the N3 data
+    header = "ISA*00*x*00*y*ZZ*S*ZZ*R*101127*1719*^*00501*1*0*P*:~ST*837*0001~N3*"
+    edi = (header + "A" * (105 - len(header)) + " ST~N4*MIAMI*FL~CLM*26463774*100***11:B:1*Y*A*Y*I~"
+           "HI*BK:0340~SE*5*0001~IEA*1*1~")
+    
+    parser = EDI837Parser()
+    for label, result in (("parse_file", parser.parse_file(edi)),
+                          ("parse_stream", parser.parse_stream(io.BytesIO(edi.encode('ascii'))))):
+        ok = result['success'] and len(result['segments']) == 8 and len(result['data']['claims']) == 1
+        print(f"{label}: {'✅ 8 segments, 1 claim' if ok else '❌ Separators misdetected'}")
+        assert ok, f"{label}: separators misdetected"
+
+def test_stream_matches_file():
+    """Test that parse_stream gives the same result as parse_file"""
+    print("\n\n🧪 TESTING STREAMED PARSING:")
+    print("=" * 50)
+    
+    # Without an ISA header the first '~' is past the first few small reads
+    no_isa_edi = ("NM1*41*2*" + "PREMIER BILLING SERVICE " * 6 + "*****46*TGJ23~"
+                  + SAMPLE_EDI[SAMPLE_EDI.index("HL*1*"):])
+    cases = (
+        ("sample", SAMPLE_EDI, 'ascii'),
+        ("latin-1", SAMPLE_EDI.replace("BEN KILDARE", "BÉN KILDARE"), 'latin-1'),
+        ("newline-separated", SAMPLE_EDI.replace("~", "~\n"), 'ascii'),
+        ("no ISA header", no_isa_edi, 'ascii'),
+    )
+    
+    parser = EDI837Parser()
+    for label, edi, encoding in cases:
+        expected = parser.parse_file(edi)
+        # Tiny chunks split segments and the ISA header across reads
+        for chunk_size in (1, 7):
+            streamed = parser.parse_stream(io.BytesIO(edi.encode(encoding)), chunk_size=chunk_size)
+            ok = (streamed['success'] and streamed['data'] == expected['data']
+                  and streamed['segments'] == expected['segments'])
+            print(f"{label} ({chunk_size}-byte reads): {'✅ Matches parse_file' if ok else '❌ Differs from parse_file'}")
+            assert ok, f"{label}: parse_stream differs from parse_file"
+
+def test_gzip_negotiation():
+    """Test that responses are only gzipped for clients that accept gzip"""
+    print("\n\n🧪 TESTING GZIP NEGOTIATION:")
+    print("=" * 50)
+    
+    from app import app
+    client = app.test_client()
+    cases = (
+        ("gzip", True),
+        ("gzip;q=0, identity", False),
+        ("identity", False),
+    )
+    
+    for accept_encoding, gzipped in cases:
+        for label, response in (
+                ("/sample", client.get('/sample', headers={'Accept-Encoding': accept_encoding})),
+                ("/parse_text", client.post('/parse_text', data=SAMPLE_EDI, content_type='text/plain',
+                                            headers={'Accept-Encoding': accept_encoding}))):
+            ok = (response.headers.get('Content-Encoding') == 'gzip') == gzipped
+            print(f"{label} with {accept_encoding!r}: {'✅' if ok else '❌'} {'gzip' if gzipped else 'identity'}")
+            assert ok, f"{label}: wrong encoding for Accept-Encoding {accept_encoding!r}"
+
 if __name__ == "__main__":
     test_sample_edi()
     test_parser_methods()
+    test_non_padded_isa()
+    test_stream_matches_file()
+    test_gzip_negotiation()
     
     print("\n" + "=" * 50)
     print("🚀 Web Application Access:")